@@ -64,6 +64,30 @@ def make_bit_order(
     )
 
 
+def labels_to_indices(
+    labels: np.ndarray, sorter: np.ndarray, column: np.ndarray
+) -> np.ndarray:
+    """Convert a column of enum labels into the label indices PandA expects, using
+    one binary search over the sorted labels rather than a lookup per row.
+
+    Args:
+        labels: The field's labels, in PandA's order
+        sorter: The indices that sort `labels`, as from a stable `np.argsort`
+        column: The enum labels to convert
+
+    Raises:
+        ValueError: If any value in the column is not one of the labels"""
+    positions = np.searchsorted(labels, column, sorter=sorter)
+    indices = sorter[np.minimum(positions, len(labels) - 1)]
+    unknown = labels[indices] != column
+    if np.any(unknown):
+        raise ValueError(
+            f"Values {list(np.asarray(column)[unknown])} are not in labels "
+            f"{list(labels)}"
+        )
+    return indices.astype(np.uint32)
+
+
 class TableModeEnum(Enum):
     """Operation modes for the MODES record on PandA table fields"""
 
@@ -83,6 +107,9 @@ class TableUpdater:
     # Order is exactly that which PandA sent.
     table_fields_records: typing.OrderedDict[str, TableFieldRecordContainer]
     all_values_dict: Dict[EpicsName, RecordValue]
+    # The labels of each enum field, and the indices that sort them
+    field_labels: Dict[str, np.ndarray]
+    field_label_sorters: Dict[str, np.ndarray]
 
     def __init__(
         self,
@@ -145,6 +172,20 @@ class TableUpdater:
         )
         self.all_values_dict = all_values_dict
 
+        # Build the enum label lookups once, rather than on every table update
+        self.field_labels = {}
+        self.field_label_sorters = {}
+        for field_name, field_details in field_info.fields.items():
+            if field_details.labels:
+                max_length = max([len(x) for x in field_details.labels])
+                label_array = np.array(
+                    field_details.labels, dtype=f"<U{max_length + 1}"
+                )
+                self.field_labels[field_name] = label_array
+                self.field_label_sorters[field_name] = np.argsort(
+                    label_array, kind="stable"
+                )
+
         pvi_table_name = epics_to_pvi_name(table_name)
 
         # The PVI group to put all records into
@@ -322,10 +363,21 @@ class TableUpdater:
                 logging.info(f"Sending table data for {self.table_name} to PandA")
 
                 table = {}
-                for x in self.table_fields_records:
-                    record_info = self.table_fields_records[x].record_info
+                for x, field_record in self.table_fields_records.items():
+                    record_info = field_record.record_info
                     if record_info:
-                        table[x] = record_info.record.get()
+                        column = record_info.record.get()
+                        if (
+                            x in self.field_labels
+                            and len(column)
+                            and isinstance(column[0], str)
+                        ):
+                            column = labels_to_indices(
+                                self.field_labels[x],
+                                self.field_label_sorters[x],
+                                column,
+                            )
+                        table[x] = column
 
                 packed_data = table_to_words(table, self.field_info)
 
@@ -353,13 +405,7 @@ class TableUpdater:
 
                 assert isinstance(old_val, list)
 
-                field_data = words_to_table(old_val, self.field_info)
-                for field_name, field_record in self.table_fields_records.items():
-                    assert field_record.record_info
-                    # Table records are never In type, so can always disable processing
-                    field_record.record_info.record.set(
-                        field_data[field_name], process=False
-                    )
+                self._set_field_records(words_to_table(old_val, self.field_info))
             finally:
                 # Already in on_update of this record, so disable processing to
                 # avoid recursion
@@ -373,18 +419,23 @@ class TableUpdater:
             panda_field_name = epics_to_panda_name(self.table_name)
             panda_vals = await self.client.send(GetMultiline(f"{panda_field_name}"))
 
-            field_data = words_to_table(panda_vals, self.field_info)
-
-            for field_name, field_record in self.table_fields_records.items():
-                assert field_record.record_info
-                field_record.record_info.record.set(
-                    field_data[field_name], process=False
-                )
+            self._set_field_records(words_to_table(panda_vals, self.field_info))
 
             # Already in on_update of this record, so disable processing to
             # avoid recursion
             self.mode_record_info.record.set(TableModeEnum.VIEW.value, process=False)
 
+    def _set_field_records(self, field_data: Dict[str, UnpackedArray]) -> None:
+        """Set each field's record to its column of the given table data.
+
+        The sets are done in turn on the calling thread. Each is a short in-process
+        database put, so handing them to worker threads would cost more than it saves
+        and would leave the order the records update in undefined."""
+        for field_name, field_record in self.table_fields_records.items():
+            assert field_record.record_info
+            # Table records are never In type, so can always disable processing
+            field_record.record_info.record.set(field_data[field_name], process=False)
+
     def _construct_waveform_val(
         self,
         field_data: Dict[str, UnpackedArray],
@@ -395,11 +446,9 @@ class TableUpdater:
         the numeric values PandA sends us into the string representation. For all other
         types the numeric representation is used."""
         if field_details.labels:
-            max_length = max([len(x) for x in field_details.labels])
-            return np.array(
-                [field_details.labels[x] for x in field_data[field_name]],
-                dtype=f"<U{max_length + 1}",
-            )
+            # Index the labels with the whole column at once, rather than looking up
+            # each row's label in Python
+            return self.field_labels[field_name][field_data[field_name]]
         return field_data[field_name]
 
     def update_table(self, new_values: List[str]) -> None:
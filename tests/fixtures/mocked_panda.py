@@ -50,6 +50,31 @@ BOBFILE_DIR = Path(__file__).parent.parent / "test-bobfiles"
 TIMEOUT = 10
 TEST_PREFIX = "TEST_PREFIX"
 
+# The SEQ.TABLE data the IOC Puts to PandA once REPEATS is set to 1 on every row of
+# the five row table sent in the GetChanges responses
+SEQ_TABLE_REPEATS_SET_DATA = (
+    "2457862145",
+    "4294967291",
+    "100",
+    "0",
+    "1",
+    "0",
+    "0",
+    "0",
+    "4293918721",
+    "0",
+    "9",
+    "9999",
+    "2035875841",
+    "444444",
+    "5",
+    "1",
+    "3464232961",
+    "4294967197",
+    "99999",
+    "2222",
+)
+
 
 def append_random_uppercase(pv: str) -> str:
     return pv + "-" + str(uuid4())[:8].upper()
@@ -151,8 +176,7 @@ def command_to_key(dataclass_object: Command):
 
 class ResponseHandler:
     def __init__(self, responses):
-        if responses:
-            self.responses = responses
+        self.responses = responses
 
     def __call__(self, command: Command[T]) -> Any:
         key = command_to_key(command)
@@ -423,28 +447,7 @@ def multiple_seq_responses(table_field_info, table_data_1, table_data_2):
         command_to_key(
             Put(
                 field="SEQ1.TABLE",
-                value=[
-                    "2457862145",
-                    "4294967291",
-                    "100",
-                    "0",
-                    "1",
-                    "0",
-                    "0",
-                    "0",
-                    "4293918721",
-                    "0",
-                    "9",
-                    "9999",
-                    "2035875841",
-                    "444444",
-                    "5",
-                    "1",
-                    "3464232961",
-                    "4294967197",
-                    "99999",
-                    "2222",
-                ],
+                value=list(SEQ_TABLE_REPEATS_SET_DATA),
             )
         ): repeat(None),
         command_to_key(
@@ -558,28 +561,7 @@ def no_numbered_suffix_to_metadata_responses(table_field_info, table_data_1):
         command_to_key(
             Put(
                 field="SEQ.TABLE",
-                value=[
-                    "2457862145",
-                    "4294967291",
-                    "100",
-                    "0",
-                    "1",
-                    "0",
-                    "0",
-                    "0",
-                    "4293918721",
-                    "0",
-                    "9",
-                    "9999",
-                    "2035875841",
-                    "444444",
-                    "5",
-                    "1",
-                    "3464232961",
-                    "4294967197",
-                    "99999",
-                    "2222",
-                ],
+                value=list(SEQ_TABLE_REPEATS_SET_DATA),
             )
         ): repeat(None),
         # DRVL changing from 8e-06 ms to minutes
@@ -756,28 +738,7 @@ def standard_responses(table_field_info, table_data_1, table_data_2):
         command_to_key(
             Put(
                 field="SEQ.TABLE",
-                value=[
-                    "2457862145",
-                    "4294967291",
-                    "100",
-                    "0",
-                    "1",
-                    "0",
-                    "0",
-                    "0",
-                    "4293918721",
-                    "0",
-                    "9",
-                    "9999",
-                    "2035875841",
-                    "444444",
-                    "5",
-                    "1",
-                    "3464232961",
-                    "4294967197",
-                    "99999",
-                    "2222",
-                ],
+                value=list(SEQ_TABLE_REPEATS_SET_DATA),
             )
         ): repeat(None),
         command_to_key(
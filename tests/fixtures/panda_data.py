@@ -7,7 +7,7 @@ from pandablocks.responses import FieldCapture, TableFieldDetails, TableFieldInf
 from pandablocks_ioc._types import EpicsName
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def table_fields() -> Dict[str, TableFieldDetails]:
     """Table field definitions, taken from a SEQ.TABLE instance.
     Associated with table_data and table_field_info fixtures"""
@@ -148,7 +148,7 @@ def table_fields() -> Dict[str, TableFieldDetails]:
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def table_field_info(table_fields) -> TableFieldInfo:
     """Table data associated with table_fields and table_data fixtures"""
     return TableFieldInfo(
@@ -156,7 +156,7 @@ def table_field_info(table_fields) -> TableFieldInfo:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def table_data_1() -> List[str]:
     """Table data associated with table_fields and table_field_info fixtures.
     See table_unpacked_data for the unpacked equivalent"""
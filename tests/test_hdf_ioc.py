@@ -6,15 +6,16 @@ from asyncio import CancelledError
 from collections import deque
 from multiprocessing.connection import Connection
 from pathlib import Path
-from typing import AsyncGenerator, Generator
+from typing import Any, Callable, Generator, List, Optional, Type, Union
 
 import h5py
 import numpy
 import pytest
 import pytest_asyncio
-from aioca import DBR_CHAR_STR, CANothing, caget, caput
+from aioca import DBR_CHAR_STR, CANothing, caget, camonitor, caput
 from mock.mock import AsyncMock, MagicMock, patch
 from pandablocks.asyncio import AsyncioClient
+from pandablocks.hdf import stop_pipeline
 from pandablocks.responses import (
     EndData,
     EndReason,
@@ -24,10 +25,13 @@ from pandablocks.responses import (
     StartData,
 )
 from softioc import asyncio_dispatcher, builder, softioc
+from softioc.device import RecordLookup
+from softioc.pythonSoftIoc import RecordWrapper
 
 from fixtures.mocked_panda import (
     TIMEOUT,
     MockedAsyncioClient,
+    ResponseHandler,
     Rows,
     append_random_uppercase,
     custom_logger,
@@ -45,11 +49,13 @@ from pandablocks_ioc._hdf_ioc import (
 NAMESPACE_PREFIX = "HDF-RECORD-PREFIX"
 
 
-@pytest.fixture
-def new_random_hdf5_prefix():
-    test_prefix = append_random_uppercase(NAMESPACE_PREFIX)
-    hdf5_test_prefix = test_prefix + ":DATA"
-    return test_prefix, hdf5_test_prefix
+@pytest.fixture(scope="module")
+def event_loop():
+    """Share one event loop between all the async tests in this module, rather than
+    creating and closing one per test"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
 
 
 DUMP_FIELDS = [
@@ -112,18 +118,51 @@ DUMP_FIELDS = [
 ]
 
 
+# Single field StartData shared by the _handle_hdf5_data tests, built once rather
+# than in every mocked data stream
+BITS2_START_DATA = StartData(DUMP_FIELDS[:1], 0, "Scaled", "Framed", 52)
+
+
+# Immutable data streams for the _handle_hdf5_data tests, built once at import.
+# The tests request exactly as many frames as each stream holds, so no FrameData
+# is ever cut (and so modified) by the controller
+SLOW_DUMP_EXPECTED = (
+    ReadyData(),
+    StartData(DUMP_FIELDS, 0, "Scaled", "Framed", 52),
+    FrameData(Rows([0, 1, 1, 3, 5.6e-08, 1, 2])),
+    FrameData(Rows([8, 2, 2, 6, 1.000000056, 2, 4])),
+    FrameData(Rows([0, 3, 3, 9, 2.000000056, 3, 6])),
+    FrameData(Rows([8, 4, 4, 12, 3.000000056, 4, 8])),
+    FrameData(Rows([0, 5, 5, 15, 4.000000056, 5, 10])),
+    EndData(5, EndReason.DISARMED),
+)
+
+# Two back to back data captures, with the EndData cut off
+TWO_START_DATA = SLOW_DUMP_EXPECTED[:-1] * 2
+
+# Just the start of a data capture, for streams that then raise an exception
+START_OF_CAPTURE = (ReadyData(), BITS2_START_DATA)
+
+# A pair of data captures, with differing StartData items
+MISMATCHING_START_DATA = (
+    ReadyData(),
+    BITS2_START_DATA,
+    FrameData(Rows([0, 1, 1, 3, 5.6e-08, 1, 2])),
+    # Implicit end of first data here
+    ReadyData(),
+    StartData(
+        [],
+        0,
+        "Different",
+        "Also Different",
+        52,
+    ),
+)
+
+
 @pytest_asyncio.fixture
 def slow_dump_expected():
-    yield [
-        ReadyData(),
-        StartData(DUMP_FIELDS, 0, "Scaled", "Framed", 52),
-        FrameData(Rows([0, 1, 1, 3, 5.6e-08, 1, 2])),
-        FrameData(Rows([8, 2, 2, 6, 1.000000056, 2, 4])),
-        FrameData(Rows([0, 3, 3, 9, 2.000000056, 3, 6])),
-        FrameData(Rows([8, 4, 4, 12, 3.000000056, 4, 8])),
-        FrameData(Rows([0, 5, 5, 15, 4.000000056, 5, 10])),
-        EndData(5, EndReason.DISARMED),
-    ]
+    yield SLOW_DUMP_EXPECTED
 
 
 @pytest_asyncio.fixture
@@ -217,62 +256,119 @@ def fast_dump_expected():
     ]
 
 
-@pytest_asyncio.fixture
-async def hdf5_controller(
-    clear_records: None, standard_responses, new_random_hdf5_prefix
-) -> AsyncGenerator:
-    """Construct an HDF5 controller, ensuring we delete all records before
-    and after the test runs, as well as ensuring the sockets opened in the HDF5
-    controller are closed"""
+@pytest.fixture(scope="module")
+def hdf5_controller_shared() -> Generator[HDF5RecordController, None, None]:
+    """Construct one HDF5 controller for the whole module, in a record directory of
+    its own that is discarded, along with the records, once the module finishes.
+    Use `hdf5_controller`, which undoes each test's changes to it."""
 
-    test_prefix, hdf5_test_prefix = new_random_hdf5_prefix
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(RecordLookup, "_RecordDirectory", {})
+        builder.ResetRecords()
 
-    hdf5_controller = HDF5RecordController(AsyncioClient("localhost"), test_prefix)
-    yield hdf5_controller
-    # Give time for asyncio to fully close its connections
-    await asyncio.sleep(0)
+        test_prefix = append_random_uppercase(NAMESPACE_PREFIX)
+        yield HDF5RecordController(MagicMock(spec=AsyncioClient), test_prefix)
 
+        builder.ResetRecords()
 
-def subprocess_func(
-    namespace_prefix: str, standard_responses, child_conn: Connection
-) -> None:
-    """Function to start the HDF5 IOC"""
+
+@pytest.fixture
+def hdf5_controller(
+    hdf5_controller_shared: HDF5RecordController,
+) -> Generator[HDF5RecordController, None, None]:
+    """Provide the module's HDF5 controller with a fresh mock client, as no test
+    talks to a real PandA. Attributes the test replaces, and the values of the
+    controller's records, are restored when the test finishes."""
+
+    controller = hdf5_controller_shared
+    attributes = dict(vars(controller))
+    record_values = {
+        record: record.get()
+        for record in attributes.values()
+        if isinstance(record, RecordWrapper)
+    }
+    controller._client = MagicMock(spec=AsyncioClient)
+    try:
+        yield controller
+    finally:
+        vars(controller).clear()
+        vars(controller).update(attributes)
+        for record, value in record_values.items():
+            record.set(value)
+
+
+async def reset_hdf5_records(controller: HDF5RecordController) -> None:
+    """Return the records of the shared HDF5 IOC to their initial values, once any
+    capture started by the previous test has finished"""
+    if controller._handle_hdf5_data_task:
+        await asyncio.wait([controller._handle_hdf5_data_task])
+        controller._handle_hdf5_data_task = None
+
+    controller._directory_record.set("", process=False)
+    controller._file_name_record.set("", process=False)
+    controller._full_file_path_record.set("")
+    controller._capture_mode_record.set(CaptureMode.FIRST_N.value, process=False)
+    controller._num_capture_record.set(0, process=False)
+    controller._num_received_record.set(0)
+    controller._num_captured_record.set(0)
+    controller._status_message_record.set("OK")
+
+
+def subprocess_func(namespace_prefix: str, child_conn: Connection) -> None:
+    """Function to start the HDF5 IOC. Each message received on `child_conn` resets
+    the records, replying once done."""
     enable_codecov_multiprocess()
 
     async def wrapper():
         builder.SetDeviceName(namespace_prefix)
-        client = MockedAsyncioClient(standard_responses)
-        HDF5RecordController(client, namespace_prefix)
+        # The HDF5 records only use the client's data() method, so no responses are
+        # needed. Any other command raises the ResponseHandler's RuntimeError.
+        client = MockedAsyncioClient(ResponseHandler({}))
+        controller = HDF5RecordController(client, namespace_prefix)
         dispatcher = asyncio_dispatcher.AsyncioDispatcher()
         builder.LoadDatabase()
         softioc.iocInit(dispatcher)
         child_conn.send("R")
 
         # Leave this coroutine running until it's torn down by pytest
-        await asyncio.Event().wait()
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, child_conn.recv)
+            except EOFError:
+                return
+            # Records must be set from the dispatcher's loop, which runs the capture
+            await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(
+                    reset_hdf5_records(controller), dispatcher.loop
+                )
+            )
+            child_conn.send("R")
 
     custom_logger()
     asyncio.run(wrapper())
 
 
-@pytest_asyncio.fixture
-def hdf5_subprocess_ioc_no_logging_check(
-    caplog, caplog_workaround, standard_responses, new_random_hdf5_prefix, clear_records
-) -> Generator:
+@pytest.fixture(scope="module")
+def hdf5_subprocess_ioc_shared() -> Generator:
     """Create an instance of HDF5 class in its own subprocess, then start the IOC.
-    Note you probably want to use `hdf5_subprocess_ioc` instead."""
+    The IOC is shared by all tests in this module, so use `hdf5_subprocess_ioc` or
+    `hdf5_subprocess_ioc_no_logging_check` which reset its records after each test.
 
-    test_prefix, hdf5_test_prefix = new_random_hdf5_prefix
+    This must stay a separate process rather than a thread: iocInit can only be
+    called once per process, and the pytest process itself creates (and clears)
+    records for the non-IOC tests, which would clash with a running IOC."""
+
+    test_prefix = append_random_uppercase(NAMESPACE_PREFIX)
+    hdf5_test_prefix = test_prefix + ":DATA"
 
     ctx = get_multiprocessing_context()
     parent_conn, child_conn = ctx.Pipe()
-    p = ctx.Process(
-        target=subprocess_func, args=(test_prefix, standard_responses, child_conn)
-    )
+    p = ctx.Process(target=subprocess_func, args=(test_prefix, child_conn))
     try:
         p.start()
         select_and_recv(parent_conn)  # Wait for IOC to start up
-        yield test_prefix, hdf5_test_prefix
+        yield test_prefix, hdf5_test_prefix, parent_conn
     finally:
         child_conn.close()
         parent_conn.close()
@@ -282,35 +378,35 @@ def hdf5_subprocess_ioc_no_logging_check(
         # to ensure the test doesn't hang indefinitely during cleanup
 
 
-@pytest_asyncio.fixture
+@pytest.fixture
+def hdf5_subprocess_ioc_no_logging_check(hdf5_subprocess_ioc_shared) -> Generator:
+    """Provide the shared HDF5 IOC, resetting its records when the test finishes.
+    Note you probably want to use `hdf5_subprocess_ioc` instead."""
+
+    test_prefix, hdf5_test_prefix, parent_conn = hdf5_subprocess_ioc_shared
+    try:
+        yield test_prefix, hdf5_test_prefix
+    finally:
+        parent_conn.send("reset")
+        select_and_recv(parent_conn)  # Wait for the reset to finish
+
+
+@pytest.fixture
 def hdf5_subprocess_ioc(
-    caplog, caplog_workaround, standard_responses, new_random_hdf5_prefix, clear_records
+    caplog, caplog_workaround, hdf5_subprocess_ioc_shared
 ) -> Generator:
-    """Create an instance of HDF5 class in its own subprocess, then start the IOC.
+    """Provide the shared HDF5 IOC, resetting its records when the test finishes.
     When finished check logging logged no messages of WARNING or higher level."""
 
-    test_prefix, hdf5_test_prefix = new_random_hdf5_prefix
+    test_prefix, hdf5_test_prefix, parent_conn = hdf5_subprocess_ioc_shared
 
     with caplog.at_level(logging.WARNING):
         with caplog_workaround():
-            ctx = get_multiprocessing_context()
-            parent_conn, child_conn = ctx.Pipe()
-            p = ctx.Process(
-                target=subprocess_func,
-                args=(test_prefix, standard_responses, child_conn),
-            )
             try:
-                p.start()
-                select_and_recv(parent_conn)  # Wait for IOC to start up
                 yield test_prefix, hdf5_test_prefix
             finally:
-                child_conn.close()
-                parent_conn.close()
-                p.terminate()
-                p.join(timeout=TIMEOUT)
-                # Should never take anywhere near 10 seconds to terminate,
-                # it's just there to ensure the test doesn't hang indefinitely
-                # during cleanup
+                parent_conn.send("reset")
+                select_and_recv(parent_conn)  # Wait for the reset to finish
 
     # We expect all tests to pass without warnings (or worse) logged.
     assert (
@@ -318,34 +414,47 @@ def hdf5_subprocess_ioc(
     ), f"At least one warning/error/exception logged during test: {caplog.records}"
 
 
+def capture_cycle_callback(
+    connected: asyncio.Event, done: asyncio.Event
+) -> Callable[[Any], None]:
+    """Create a camonitor callback for the Capture record. `connected` is set on the
+    first update, and `done` once Capture has been seen to go to 1 and back to 0"""
+    seen_one = False
+
+    def on_update(value: Any) -> None:
+        nonlocal seen_one
+        connected.set()
+        if value == 1:
+            seen_one = True
+        elif value == 0 and seen_one:
+            done.set()
+
+    return on_update
+
+
+@pytest.mark.xdist_group(name="hdf_ioc_shared")
 async def test_hdf5_ioc(hdf5_subprocess_ioc):
     """Run the HDF5 module as its own IOC and check the expected records are created,
     with some default values checked"""
 
     test_prefix, hdf5_test_prefix = hdf5_subprocess_ioc
 
-    val = await caget(hdf5_test_prefix + ":HDFDirectory", datatype=DBR_CHAR_STR)
+    # The records are independent, so fetch them all in one round trip
+    values = await asyncio.gather(
+        caget(hdf5_test_prefix + ":HDFDirectory", datatype=DBR_CHAR_STR),
+        # Mix and match between CamelCase and UPPERCASE to check aliases work
+        caget(hdf5_test_prefix + ":HDFFILENAME", datatype=DBR_CHAR_STR),
+        caget(hdf5_test_prefix + ":NumCapture"),
+        caget(hdf5_test_prefix + ":FlushPeriod"),
+        caget(hdf5_test_prefix + ":CAPTURE"),
+        caget(hdf5_test_prefix + ":Status", datatype=DBR_CHAR_STR),
+    )
 
     # Default value of longStringOut is an array of a single NULL byte
-    assert val == ""
-
-    # Mix and match between CamelCase and UPPERCASE to check aliases work
-    val = await caget(hdf5_test_prefix + ":HDFFILENAME", datatype=DBR_CHAR_STR)
-    assert val == ""
-
-    val = await caget(hdf5_test_prefix + ":NumCapture")
-    assert val == 0
-
-    val = await caget(hdf5_test_prefix + ":FlushPeriod")
-    assert val == 1.0
-
-    val = await caget(hdf5_test_prefix + ":CAPTURE")
-    assert val == 0
-
-    val = await caget(hdf5_test_prefix + ":Status", datatype=DBR_CHAR_STR)
-    assert val == "OK"
+    assert values == ["", "", 0, 1.0, 0, "OK"]
 
 
+@pytest.mark.xdist_group(name="hdf_ioc_shared")
 async def test_hdf5_ioc_parameter_validate_works(
     hdf5_subprocess_ioc_no_logging_check, tmp_path
 ):
@@ -355,20 +464,24 @@ async def test_hdf5_ioc_parameter_validate_works(
     test_prefix, hdf5_test_prefix = hdf5_subprocess_ioc_no_logging_check
 
     # EPICS bug means caputs always appear to succeed, so do a caget to prove it worked
-    await caput(
-        hdf5_test_prefix + ":HDFDirectory",
-        str(tmp_path),
-        datatype=DBR_CHAR_STR,
-        wait=True,
-    )
-    val = await caget(hdf5_test_prefix + ":HDFDirectory", datatype=DBR_CHAR_STR)
-    assert val == str(tmp_path)
-
-    await caput(
-        hdf5_test_prefix + ":HDFFileName", "name.h5", wait=True, datatype=DBR_CHAR_STR
+    await asyncio.gather(
+        caput(
+            hdf5_test_prefix + ":HDFDirectory",
+            str(tmp_path),
+            datatype=DBR_CHAR_STR,
+            wait=True,
+        ),
+        caput(
+            hdf5_test_prefix + ":HDFFileName",
+            "name.h5",
+            wait=True,
+            datatype=DBR_CHAR_STR,
+        ),
     )
-    val = await caget(hdf5_test_prefix + ":HDFFileName", datatype=DBR_CHAR_STR)
-    assert val == "name.h5"
+    assert await asyncio.gather(
+        caget(hdf5_test_prefix + ":HDFDirectory", datatype=DBR_CHAR_STR),
+        caget(hdf5_test_prefix + ":HDFFileName", datatype=DBR_CHAR_STR),
+    ) == [str(tmp_path), "name.h5"]
 
     await caput(hdf5_test_prefix + ":Capture", 1, wait=True)
     assert await caget(hdf5_test_prefix + ":Capture") == 1
@@ -384,6 +497,7 @@ async def test_hdf5_ioc_parameter_validate_works(
     assert val == str(tmp_path) + "/name.h5"  # put should have been stopped
 
 
+@pytest.mark.xdist_group(name="hdf_ioc_shared")
 @pytest.mark.parametrize("num_capture", [1, 1000, 10000])
 async def test_hdf5_file_writing_first_n(
     hdf5_subprocess_ioc, tmp_path: Path, caplog, num_capture
@@ -392,25 +506,37 @@ async def test_hdf5_file_writing_first_n(
 
     test_prefix, hdf5_test_prefix = hdf5_subprocess_ioc
 
-    val = await caget(hdf5_test_prefix + ":CaptureMode")
-    assert val == CaptureMode.FIRST_N.value
+    # Only a single FrameData in the example data
+    assert await asyncio.gather(
+        caget(hdf5_test_prefix + ":CaptureMode"),
+        caget(hdf5_test_prefix + ":NumCapture"),
+    ) == [CaptureMode.FIRST_N.value, 0]
 
     test_dir = tmp_path
     test_filename = "test.h5"
-    await caput(
-        hdf5_test_prefix + ":HDFDirectory",
-        str(test_dir),
-        wait=True,
-        datatype=DBR_CHAR_STR,
-    )
-    val = await caget(hdf5_test_prefix + ":HDFDirectory", datatype=DBR_CHAR_STR)
-    assert val == str(test_dir)
-
-    await caput(
-        hdf5_test_prefix + ":HDFFileName", "name.h5", wait=True, datatype=DBR_CHAR_STR
+    # Independent records, so set them all in one round trip
+    await asyncio.gather(
+        caput(
+            hdf5_test_prefix + ":HDFDirectory",
+            str(test_dir),
+            wait=True,
+            datatype=DBR_CHAR_STR,
+        ),
+        caput(
+            hdf5_test_prefix + ":HDFFileName",
+            "name.h5",
+            wait=True,
+            datatype=DBR_CHAR_STR,
+        ),
+        caput(
+            hdf5_test_prefix + ":NumCapture", num_capture, wait=True, timeout=TIMEOUT
+        ),
     )
-    val = await caget(hdf5_test_prefix + ":HDFFileName", datatype=DBR_CHAR_STR)
-    assert val == "name.h5"
+    assert await asyncio.gather(
+        caget(hdf5_test_prefix + ":HDFDirectory", datatype=DBR_CHAR_STR),
+        caget(hdf5_test_prefix + ":HDFFileName", datatype=DBR_CHAR_STR),
+        caget(hdf5_test_prefix + ":NumCapture"),
+    ) == [str(test_dir), "name.h5", num_capture]
 
     await caput(
         hdf5_test_prefix + ":HDFFileName",
@@ -419,30 +545,36 @@ async def test_hdf5_file_writing_first_n(
         timeout=TIMEOUT,
         datatype=DBR_CHAR_STR,
     )
-    val = await caget(hdf5_test_prefix + ":HDFFileName", datatype=DBR_CHAR_STR)
-    assert val == test_filename
-
-    val = await caget(hdf5_test_prefix + ":HDFFullFilePath", datatype=DBR_CHAR_STR)
-    assert val == "/".join([str(tmp_path), test_filename])
-
-    # Only a single FrameData in the example data
-    assert await caget(hdf5_test_prefix + ":NumCapture") == 0
-    await caput(
-        hdf5_test_prefix + ":NumCapture", num_capture, wait=True, timeout=TIMEOUT
+    assert await asyncio.gather(
+        caget(hdf5_test_prefix + ":HDFFileName", datatype=DBR_CHAR_STR),
+        caget(hdf5_test_prefix + ":HDFFullFilePath", datatype=DBR_CHAR_STR),
+    ) == [test_filename, "/".join([str(tmp_path), test_filename])]
+
+    monitor_connected = asyncio.Event()
+    capture_done = asyncio.Event()
+    monitor = camonitor(
+        hdf5_test_prefix + ":Capture",
+        capture_cycle_callback(monitor_connected, capture_done),
     )
-    assert await caget(hdf5_test_prefix + ":NumCapture") == num_capture
+    try:
+        # Capture may finish very quickly, so the monitor must be live beforehand
+        await asyncio.wait_for(monitor_connected.wait(), TIMEOUT)
 
-    await caput(hdf5_test_prefix + ":Capture", 1, wait=True, timeout=TIMEOUT)
-    assert await caget(hdf5_test_prefix + ":NumReceived") <= num_capture
+        await caput(hdf5_test_prefix + ":Capture", 1, wait=True, timeout=TIMEOUT)
+        assert await caget(hdf5_test_prefix + ":NumReceived") <= num_capture
 
-    await asyncio.sleep(1)
-    # Capture should have closed by itself
-    assert await caget(hdf5_test_prefix + ":Capture") == 0
+        # Capture should close by itself
+        await asyncio.wait_for(capture_done.wait(), TIMEOUT)
+    finally:
+        monitor.close()
 
     assert await caget(hdf5_test_prefix + ":NumReceived") == num_capture
     assert await caget(hdf5_test_prefix + ":NumCaptured") == num_capture
     # Confirm file contains data we expect
-    with h5py.File(tmp_path / test_filename, "r") as hdf_file:
+    # The writer uses libver="latest" in SWMR mode, so read it the same way
+    with h5py.File(
+        tmp_path / test_filename, "r", libver="latest", swmr=True
+    ) as hdf_file:
         assert list(hdf_file) == [
             "COUNTER1.OUT.Max",
             "COUNTER1.OUT.Mean",
@@ -454,7 +586,7 @@ async def test_hdf5_file_writing_first_n(
             "PCAP.TS_START.Value",
         ]
 
-        assert len(hdf_file["/COUNTER1.OUT.Max"]) == num_capture
+        assert hdf_file["/COUNTER1.OUT.Max"].shape == (num_capture,)
 
     assert (
         await caget(hdf5_test_prefix + ":Status", datatype=DBR_CHAR_STR)
@@ -462,6 +594,7 @@ async def test_hdf5_file_writing_first_n(
     )
 
 
+@pytest.mark.xdist_group(name="hdf_ioc_shared")
 @pytest.mark.parametrize("num_capture", [1, 1000, 10000])
 async def test_hdf5_file_writing_last_n_endreason_not_ok(
     hdf5_subprocess_ioc, tmp_path: Path, caplog, num_capture
@@ -470,28 +603,41 @@ async def test_hdf5_file_writing_last_n_endreason_not_ok(
 
     test_prefix, hdf5_test_prefix = hdf5_subprocess_ioc
 
-    val = await caget(hdf5_test_prefix + ":CaptureMode")
-    assert val == CaptureMode.FIRST_N.value
+    # Only a single FrameData in the example data. Initially Status should be "OK"
+    assert await asyncio.gather(
+        caget(hdf5_test_prefix + ":CaptureMode"),
+        caget(hdf5_test_prefix + ":NumCapture"),
+        caget(hdf5_test_prefix + ":Status", datatype=DBR_CHAR_STR),
+    ) == [CaptureMode.FIRST_N.value, 0, "OK"]
     await caput(hdf5_test_prefix + ":CaptureMode", 1, wait=True)
     val = await caget(hdf5_test_prefix + ":CaptureMode")
     assert val == CaptureMode.LAST_N.value
 
     test_dir = tmp_path
     test_filename = "test.h5"
-    await caput(
-        hdf5_test_prefix + ":HDFDirectory",
-        str(test_dir),
-        wait=True,
-        datatype=DBR_CHAR_STR,
-    )
-    val = await caget(hdf5_test_prefix + ":HDFDirectory", datatype=DBR_CHAR_STR)
-    assert val == str(test_dir)
-
-    await caput(
-        hdf5_test_prefix + ":HDFFileName", "name.h5", wait=True, datatype=DBR_CHAR_STR
+    # Independent records, so set them all in one round trip
+    await asyncio.gather(
+        caput(
+            hdf5_test_prefix + ":HDFDirectory",
+            str(test_dir),
+            wait=True,
+            datatype=DBR_CHAR_STR,
+        ),
+        caput(
+            hdf5_test_prefix + ":HDFFileName",
+            "name.h5",
+            wait=True,
+            datatype=DBR_CHAR_STR,
+        ),
+        caput(
+            hdf5_test_prefix + ":NumCapture", num_capture, wait=True, timeout=TIMEOUT
+        ),
     )
-    val = await caget(hdf5_test_prefix + ":HDFFileName", datatype=DBR_CHAR_STR)
-    assert val == "name.h5"
+    assert await asyncio.gather(
+        caget(hdf5_test_prefix + ":HDFDirectory", datatype=DBR_CHAR_STR),
+        caget(hdf5_test_prefix + ":HDFFileName", datatype=DBR_CHAR_STR),
+        caget(hdf5_test_prefix + ":NumCapture"),
+    ) == [str(test_dir), "name.h5", num_capture]
 
     await caput(
         hdf5_test_prefix + ":HDFFileName",
@@ -500,28 +646,27 @@ async def test_hdf5_file_writing_last_n_endreason_not_ok(
         timeout=TIMEOUT,
         datatype=DBR_CHAR_STR,
     )
-    val = await caget(hdf5_test_prefix + ":HDFFileName", datatype=DBR_CHAR_STR)
-    assert val == test_filename
-
-    val = await caget(hdf5_test_prefix + ":HDFFullFilePath", datatype=DBR_CHAR_STR)
-    assert val == "/".join([str(tmp_path), test_filename])
-
-    # Only a single FrameData in the example data
-    assert await caget(hdf5_test_prefix + ":NumCapture") == 0
-    await caput(
-        hdf5_test_prefix + ":NumCapture", num_capture, wait=True, timeout=TIMEOUT
+    assert await asyncio.gather(
+        caget(hdf5_test_prefix + ":HDFFileName", datatype=DBR_CHAR_STR),
+        caget(hdf5_test_prefix + ":HDFFullFilePath", datatype=DBR_CHAR_STR),
+    ) == [test_filename, "/".join([str(tmp_path), test_filename])]
+
+    monitor_connected = asyncio.Event()
+    capture_done = asyncio.Event()
+    monitor = camonitor(
+        hdf5_test_prefix + ":Capture",
+        capture_cycle_callback(monitor_connected, capture_done),
     )
-    assert await caget(hdf5_test_prefix + ":NumCapture") == num_capture
-
-    # Initially Status should be "OK"
-    val = await caget(hdf5_test_prefix + ":Status", datatype=DBR_CHAR_STR)
-    assert val == "OK"
+    try:
+        # Capture may finish very quickly, so the monitor must be live beforehand
+        await asyncio.wait_for(monitor_connected.wait(), TIMEOUT)
 
-    await caput(hdf5_test_prefix + ":Capture", 1, wait=True, timeout=TIMEOUT)
+        await caput(hdf5_test_prefix + ":Capture", 1, wait=True, timeout=TIMEOUT)
 
-    await asyncio.sleep(1)
-    # Capture should have closed by itself
-    assert await caget(hdf5_test_prefix + ":Capture") == 0
+        # Capture should close by itself
+        await asyncio.wait_for(capture_done.wait(), TIMEOUT)
+    finally:
+        monitor.close()
 
     val = await caget(hdf5_test_prefix + ":Status", datatype=DBR_CHAR_STR)
     assert (
@@ -643,7 +788,25 @@ def differently_sized_framedata():
     ]
 
 
-def test_hdf_buffer_forever(differently_sized_framedata, tmp_path):
+@pytest.fixture
+def hdf5_buffer_factory() -> Generator[Callable[..., HDF5Buffer], None, None]:
+    """Provide a function to create HDF5Buffers, stopping their file writing
+    pipelines when the test finishes. The buffer's own __del__ only does so once
+    it is garbage collected, which may be too late for the interpreter to exit."""
+    buffers: List[HDF5Buffer] = []
+
+    def make_buffer(*args) -> HDF5Buffer:
+        buffer = HDF5Buffer(*args)
+        buffers.append(buffer)
+        return buffer
+
+    yield make_buffer
+
+    for buffer in buffers:
+        stop_pipeline(buffer.pipeline)
+
+
+def test_hdf_buffer_forever(differently_sized_framedata, hdf5_buffer_factory, tmp_path):
     filepath = str(tmp_path / "test_file.h5")
     status_output = []
     num_received_output = []
@@ -651,7 +814,7 @@ def test_hdf_buffer_forever(differently_sized_framedata, tmp_path):
     frames_written_to_file = []
     num_captured_output = []
     num_captured_setter_pipeline = NumCapturedSetter(num_captured_output.append)
-    buffer = HDF5Buffer(
+    buffer = hdf5_buffer_factory(
         CaptureMode.FOREVER,
         filepath,
         21,
@@ -686,7 +849,7 @@ def test_hdf_buffer_forever(differently_sized_framedata, tmp_path):
     )
 
 
-def test_hdf_buffer_last_n(differently_sized_framedata, tmp_path):
+def test_hdf_buffer_last_n(differently_sized_framedata, hdf5_buffer_factory, tmp_path):
     filepath = str(tmp_path / "test_file.h5")
     status_output = []
     num_received_output = []
@@ -694,7 +857,7 @@ def test_hdf_buffer_last_n(differently_sized_framedata, tmp_path):
     frames_written_to_file = []
     num_captured_output = []
     num_captured_setter_pipeline = NumCapturedSetter(num_captured_output.append)
-    buffer = HDF5Buffer(
+    buffer = hdf5_buffer_factory(
         CaptureMode.LAST_N,
         filepath,
         21,
@@ -763,14 +926,14 @@ def test_hdf_buffer_last_n(differently_sized_framedata, tmp_path):
         numpy.testing.assert_array_equal(expected_frame.data, output_frame.data)
 
 
-def test_hdf_buffer_last_n_large_data(tmp_path):
+def test_hdf_buffer_last_n_large_data(hdf5_buffer_factory, tmp_path):
     filepath = str(tmp_path / "test_file.h5")
     status_output = []
     num_received_output = []
     num_captured_output = []
     frames_written_to_file = []
     num_captured_setter_pipeline = NumCapturedSetter(num_captured_output.append)
-    buffer = HDF5Buffer(
+    buffer = hdf5_buffer_factory(
         CaptureMode.LAST_N,
         filepath,
         25000,
@@ -817,8 +980,7 @@ def test_hdf_parameter_validate_not_capturing(hdf5_controller: HDF5RecordControl
     """Test that parameter_validate allows record updates when capturing is off"""
 
     hdf5_controller._capture_control_record = MagicMock()
-    # Default return value for capturing off, allowing validation method to pass
-    hdf5_controller._capture_control_record.get = MagicMock(return_value=0)
+    # Capturing off, allowing validation method to pass
     hdf5_controller._capture_control_record.get.return_value = 0
 
     # Don't care about the record being validated, just mock it
@@ -829,276 +991,120 @@ def test_hdf_parameter_validate_capturing(hdf5_controller: HDF5RecordController)
     """Test that parameter_validate stops record updates when capturing is on"""
 
     hdf5_controller._capture_control_record = MagicMock()
-    # Default return value for capturing off, allowing validation method to pass
-    hdf5_controller._capture_control_record.get = MagicMock(return_value=0)
+    # Capturing on, so validation method should fail
     hdf5_controller._capture_control_record.get.return_value = 1
 
     # Don't care about the record being validated, just mock it
     assert hdf5_controller._parameter_validate(MagicMock(), None) is False
 
 
+@pytest.mark.parametrize(
+    "data_stream, raises, num_capture, expected_status, expected_calls, expected_end",
+    [
+        pytest.param(
+            SLOW_DUMP_EXPECTED,
+            None,
+            5,
+            "Requested number of frames captured",
+            # len 7 for 1 StartData, 5 FrameData and 1 EndData
+            7,
+            EndData(5, EndReason.OK),
+            id="single_dataset",
+        ),
+        pytest.param(
+            TWO_START_DATA,
+            None,
+            10,
+            "Requested number of frames captured",
+            # len 13 for 2 StartData, 10 FrameData and 1 EndData
+            13,
+            EndData(10, EndReason.OK),
+            id="two_start_data",
+        ),
+        pytest.param(
+            MISMATCHING_START_DATA,
+            None,
+            10,
+            "Mismatched StartData packet for file",
+            # len 3 - one StartData, one FrameData, one EndData
+            3,
+            EndData(1, EndReason.START_DATA_MISMATCH),
+            id="mismatching_start_data",
+        ),
+        pytest.param(
+            # This mimics the task being cancelled
+            START_OF_CAPTURE,
+            CancelledError,
+            0,
+            "Capturing disabled",
+            # len 2 - one StartData, one EndData
+            2,
+            EndData(0, EndReason.MANUALLY_STOPPED),
+            id="cancelled_error",
+        ),
+        pytest.param(
+            START_OF_CAPTURE,
+            Exception("Test exception"),
+            0,
+            "Capture disabled, unexpected exception",
+            # len 2 - one StartData, one EndData
+            2,
+            EndData(0, EndReason.UNKNOWN_EXCEPTION),
+            id="unexpected_exception",
+        ),
+    ],
+)
 @patch("pandablocks_ioc._hdf_ioc.stop_pipeline")
 @patch("pandablocks_ioc._hdf_ioc.create_default_pipeline")
 async def test_handle_data(
     mock_create_default_pipeline: MagicMock,
     mock_stop_pipeline: MagicMock,
     hdf5_controller: HDF5RecordController,
-    slow_dump_expected,
-):
-    """Test that _handle_hdf5_data can process a normal stream of Data"""
-
-    async def mock_data(scaled, flush_period):
-        for item in slow_dump_expected:
-            yield item
-
-    # Set up all the mocks
-    hdf5_controller._get_filepath = MagicMock(  # type: ignore
-        return_value="Some/Filepath"
-    )
-    hdf5_controller._client.data = mock_data  # type: ignore
-    pipeline_mock = MagicMock()
-    mock_create_default_pipeline.side_effect = [pipeline_mock]
-    hdf5_controller._num_capture_record = MagicMock()
-    hdf5_controller._num_capture_record.get = MagicMock(return_value=5)  # type: ignore
-
-    await hdf5_controller._handle_hdf5_data()
-
-    # Check it ran correctly
-    assert hdf5_controller._capture_control_record.get() == 0
-    assert (
-        hdf5_controller._status_message_record.get()
-        == "Requested number of frames captured"
-    )
-    assert pipeline_mock[0].queue.put_nowait.call_count == 7
-    pipeline_mock[0].queue.put_nowait.assert_called_with(EndData(5, EndReason.OK))
-
-
-@patch("pandablocks_ioc._hdf_ioc.stop_pipeline")
-@patch("pandablocks_ioc._hdf_ioc.create_default_pipeline")
-async def test_handle_data_two_start_data(
-    mock_create_default_pipeline: MagicMock,
-    mock_stop_pipeline: MagicMock,
-    hdf5_controller: HDF5RecordController,
-    slow_dump_expected,
-):
-    """Test that _handle_hdf5_data works correctly over multiple datasets"""
-
-    async def mock_data(scaled, flush_period):
-        doubled_list = list(slow_dump_expected)[:-1]  # cut off EndData
-        doubled_list.extend(doubled_list)
-        for item in doubled_list:
-            yield item
-
-    # Set up all the mocks
-    hdf5_controller._get_filepath = MagicMock(  # type: ignore
-        return_value="Some/Filepath"
-    )
-    hdf5_controller._client.data = mock_data  # type: ignore
-    pipeline_mock = MagicMock()
-    mock_create_default_pipeline.side_effect = [pipeline_mock]
-    hdf5_controller._num_capture_record = MagicMock()
-    hdf5_controller._num_capture_record.get = MagicMock(return_value=10)  # type: ignore
-
-    await hdf5_controller._handle_hdf5_data()
-
-    # Check it ran correctly
-    assert hdf5_controller._capture_control_record.get() == 0
-    assert (
-        hdf5_controller._status_message_record.get()
-        == "Requested number of frames captured"
-    )
-    # len 13 for 2 StartData, 10 FrameData and 1 EndData
-    assert pipeline_mock[0].queue.put_nowait.call_count == 13
-    pipeline_mock[0].queue.put_nowait.assert_called_with(EndData(10, EndReason.OK))
-
-
-@patch("pandablocks_ioc._hdf_ioc.stop_pipeline")
-@patch("pandablocks_ioc._hdf_ioc.create_default_pipeline")
-async def test_handle_data_mismatching_start_data(
-    mock_create_default_pipeline: MagicMock,
-    mock_stop_pipeline: MagicMock,
-    hdf5_controller: HDF5RecordController,
+    data_stream: tuple,
+    raises: Optional[Union[BaseException, Type[BaseException]]],
+    num_capture: int,
+    expected_status: str,
+    expected_calls: int,
+    expected_end: EndData,
 ):
-    """Test that _handle_hdf5_data stops capturing when different StartData items
-    received"""
+    """Test that _handle_hdf5_data processes a stream of Data, stopping once the
+    requested number of frames are captured, the StartData changes, or the stream
+    raises an exception"""
 
     async def mock_data(scaled, flush_period):
-        """Return a pair of data captures, with differing StartData items"""
-        list = [
-            ReadyData(),
-            StartData(
-                [
-                    FieldCapture(
-                        name="PCAP.BITS2",
-                        type=numpy.dtype("uint32"),
-                        capture="Value",
-                        scale=1,
-                        offset=0,
-                        units="",
-                    )
-                ],
-                0,
-                "Scaled",
-                "Framed",
-                52,
-            ),
-            FrameData(Rows([0, 1, 1, 3, 5.6e-08, 1, 2])),
-            # Implicit end of first data here
-            ReadyData(),
-            StartData(
-                [],
-                0,
-                "Different",
-                "Also Different",
-                52,
-            ),
-        ]
-        for item in list:
+        for item in data_stream:
             yield item
+        if raises:
+            raise raises
 
     # Set up all the mocks
     hdf5_controller._get_filepath = MagicMock(  # type: ignore
         return_value="Some/Filepath"
     )
     hdf5_controller._client.data = mock_data  # type: ignore
-    pipeline_mock = MagicMock()
+    pipeline_mock = MagicMock(spec=list)
     mock_create_default_pipeline.side_effect = [pipeline_mock]
     hdf5_controller._num_capture_record = MagicMock()
-    hdf5_controller._num_capture_record.get = MagicMock(return_value=10)  # type: ignore
-
-    await hdf5_controller._handle_hdf5_data()
-
-    # Check it ran correctly
-    assert hdf5_controller._capture_control_record.get() == 0
-    assert (
-        hdf5_controller._status_message_record.get()
-        == "Mismatched StartData packet for file"
-    )
-    # len 3 - one StartData, one FrameData, one EndData
-    assert pipeline_mock[0].queue.put_nowait.call_count == 3
-    pipeline_mock[0].queue.put_nowait.assert_called_with(
-        EndData(1, EndReason.START_DATA_MISMATCH)
-    )
-
-
-@patch("pandablocks_ioc._hdf_ioc.stop_pipeline")
-@patch("pandablocks_ioc._hdf_ioc.create_default_pipeline")
-async def test_handle_data_cancelled_error(
-    mock_create_default_pipeline: MagicMock,
-    mock_stop_pipeline: MagicMock,
-    hdf5_controller: HDF5RecordController,
-):
-    """Test that _handle_hdf5_data stops capturing when it receives a CancelledError"""
-
-    async def mock_data(scaled, flush_period):
-        """Return the start of data capture, then raise a CancelledError.
-        This mimics the task being cancelled."""
-        list = [
-            ReadyData(),
-            StartData(
-                [
-                    FieldCapture(
-                        name="PCAP.BITS2",
-                        type=numpy.dtype("uint32"),
-                        capture="Value",
-                        scale=1,
-                        offset=0,
-                        units="",
-                    )
-                ],
-                0,
-                "Scaled",
-                "Framed",
-                52,
-            ),
-        ]
-        for item in list:
-            yield item
-        raise CancelledError
-
-    # Set up all the mocks
-    hdf5_controller._get_filepath = MagicMock(  # type: ignore
-        return_value="Some/Filepath"
-    )
-    hdf5_controller._client.data = mock_data  # type: ignore
-    pipeline_mock = MagicMock()
-    mock_create_default_pipeline.side_effect = [pipeline_mock]
-
-    await hdf5_controller._handle_hdf5_data()
-
-    # Check it ran correctly
-    assert hdf5_controller._capture_control_record.get() == 0
-    assert hdf5_controller._status_message_record.get() == "Capturing disabled"
-    # len 2 - one StartData, one EndData
-    assert pipeline_mock[0].queue.put_nowait.call_count == 2
-    pipeline_mock[0].queue.put_nowait.assert_called_with(
-        EndData(0, EndReason.MANUALLY_STOPPED)
-    )
-
-
-@patch("pandablocks_ioc._hdf_ioc.stop_pipeline")
-@patch("pandablocks_ioc._hdf_ioc.create_default_pipeline")
-async def test_handle_data_unexpected_exception(
-    mock_create_default_pipeline: MagicMock,
-    mock_stop_pipeline: MagicMock,
-    hdf5_controller: HDF5RecordController,
-):
-    """Test that _handle_hdf5_data stops capturing when it receives an unexpected
-    exception"""
-
-    async def mock_data(scaled, flush_period):
-        """Return the start of data capture, then raise an Exception."""
-        list = [
-            ReadyData(),
-            StartData(
-                [
-                    FieldCapture(
-                        name="PCAP.BITS2",
-                        type=numpy.dtype("uint32"),
-                        capture="Value",
-                        scale=1,
-                        offset=0,
-                        units="",
-                    )
-                ],
-                0,
-                "Scaled",
-                "Framed",
-                52,
-            ),
-        ]
-        for item in list:
-            yield item
-        raise Exception("Test exception")
-
-    # Set up all the mocks
-    hdf5_controller._get_filepath = MagicMock(  # type: ignore
-        return_value="Some/Filepath"
+    hdf5_controller._num_capture_record.get = MagicMock(  # type: ignore
+        return_value=num_capture
     )
-    hdf5_controller._client.data = mock_data  # type: ignore
-    pipeline_mock = MagicMock()
-    mock_create_default_pipeline.side_effect = [pipeline_mock]
 
     await hdf5_controller._handle_hdf5_data()
 
     # Check it ran correctly
     assert hdf5_controller._capture_control_record.get() == 0
-    assert (
-        hdf5_controller._status_message_record.get()
-        == "Capture disabled, unexpected exception"
-    )
-    # len 2 - one StartData, one EndData
-    assert pipeline_mock[0].queue.put_nowait.call_count == 2
-    pipeline_mock[0].queue.put_nowait.assert_called_with(
-        EndData(0, EndReason.UNKNOWN_EXCEPTION)
-    )
+    assert hdf5_controller._status_message_record.get() == expected_status
+    assert pipeline_mock[0].queue.put_nowait.call_count == expected_calls
+    pipeline_mock[0].queue.put_nowait.assert_called_with(expected_end)
 
 
 async def test_capture_on_update(
     hdf5_controller: HDF5RecordController,
 ):
     """Test _capture_on_update correctly starts the data capture task"""
-    hdf5_controller._handle_hdf5_data = AsyncMock()  # type: ignore
+    hdf5_controller._handle_hdf5_data = AsyncMock(  # type: ignore
+        spec=hdf5_controller._handle_hdf5_data
+    )
 
     await hdf5_controller._capture_on_update(1)
 
@@ -1112,7 +1118,7 @@ async def test_capture_on_update_cancel_task(
     """Test _capture_on_update correctly cancels an already running task
     when Capture=0"""
 
-    task_mock = MagicMock()
+    task_mock = MagicMock(spec=asyncio.Task)
     hdf5_controller._handle_hdf5_data_task = task_mock
 
     await hdf5_controller._capture_on_update(0)
@@ -1125,9 +1131,11 @@ async def test_capture_on_update_cancel_unexpected_task(
 ):
     """Test _capture_on_update correctly cancels an already running task
     when Capture=1"""
-    task_mock = MagicMock()
+    task_mock = MagicMock(spec=asyncio.Task)
     hdf5_controller._handle_hdf5_data_task = task_mock
-    hdf5_controller._handle_hdf5_data = AsyncMock()  # type: ignore
+    hdf5_controller._handle_hdf5_data = AsyncMock(  # type: ignore
+        spec=hdf5_controller._handle_hdf5_data
+    )
 
     await hdf5_controller._capture_on_update(1)
 
@@ -1,20 +1,27 @@
 import asyncio
 import typing
-from typing import Dict, List
-from unittest.mock import AsyncMock
+from dataclasses import dataclass, field
+from typing import Dict, Generator, List
+from unittest.mock import AsyncMock, Mock
 
 import numpy
 import numpy.testing
 import pytest
 from aioca import caget, camonitor, caput
-from mock.mock import MagicMock, PropertyMock
+from mock.mock import MagicMock
 from numpy import ndarray
 from pandablocks.asyncio import AsyncioClient
 from pandablocks.commands import GetMultiline, Put
 from pandablocks.responses import TableFieldDetails, TableFieldInfo
-from softioc import alarm
-
-from fixtures.mocked_panda import TIMEOUT, command_to_key, multiprocessing_queue_to_list
+from softioc import alarm, builder
+from softioc.device import RecordLookup
+
+from fixtures.mocked_panda import (
+    SEQ_TABLE_REPEATS_SET_DATA,
+    TIMEOUT,
+    command_to_key,
+    multiprocessing_queue_to_list,
+)
 from pandablocks_ioc._tables import (
     TableFieldRecordContainer,
     TableModeEnum,
@@ -26,7 +33,28 @@ PANDA_FORMAT_TABLE_NAME = "SEQ1.TABLE"
 EPICS_FORMAT_TABLE_NAME = "SEQ1:TABLE"
 
 
-@pytest.fixture
+def _eq(actual, desired) -> None:
+    """Assert two arrays are equal. Cheaper than numpy.testing.assert_array_equal in
+    the per-field loops below, as the error message is only built on failure"""
+    assert numpy.array_equal(actual, desired), numpy.testing.build_err_msg(
+        [actual, desired], "Arrays are not equal", names=("actual", "desired")
+    )
+
+
+@dataclass
+class FakeRecord:
+    """A lightweight stand-in for a table field's WaveformOut record. Only `set` is a
+    mock, as it is the only method tests make assertions about."""
+
+    name: str
+    value: ndarray
+    set: Mock = field(default_factory=Mock)
+
+    def get(self) -> ndarray:
+        return self.value
+
+
+@pytest.fixture(scope="module")
 def table_data_1_dict(table_data_1: List[str]) -> Dict[EpicsName, RecordValue]:
     return {EpicsName(EPICS_FORMAT_TABLE_NAME): table_data_1}
 
@@ -38,31 +66,56 @@ def table_fields_records(
 ) -> Dict[str, TableFieldRecordContainer]:
     """A faked list of records containing the table_unpacked_data"""
 
-    data = {}
-    for (field_name, field_info), data_array in zip(
-        table_fields.items(), table_unpacked_data.values()
-    ):
-        mocked_record = MagicMock()
-        type(mocked_record).name = PropertyMock(
-            return_value=EPICS_FORMAT_TABLE_NAME + ":" + field_name
-        )
-        mocked_record.get = MagicMock(return_value=data_array)
+    def make_record_info(record: FakeRecord) -> RecordInfo:
         record_info = RecordInfo(lambda x: None)
-        record_info.add_record(mocked_record)
-        data[field_name] = TableFieldRecordContainer(field_info, record_info)
-    return data
+        record_info.add_record(record)  # type: ignore
+        return record_info
+
+    return {
+        field_name: TableFieldRecordContainer(
+            field_info,
+            make_record_info(
+                FakeRecord(EPICS_FORMAT_TABLE_NAME + ":" + field_name, data_array)
+            ),
+        )
+        for (field_name, field_info), data_array in zip(
+            table_fields.items(), table_unpacked_data.values()
+        )
+    }
 
 
-@pytest.fixture
-def table_updater(
+@pytest.fixture(scope="module")
+def table_updater_shared(
     table_field_info: TableFieldInfo,
     table_data_1_dict: Dict[EpicsName, RecordValue],
-    clear_records,
-    table_unpacked_data: typing.OrderedDict[EpicsName, ndarray],
-) -> TableUpdater:
-    """Provides a TableUpdater with configured records and mocked functionality"""
-    client = AsyncioClient("123")
-    client.send = AsyncMock()  # type: ignore
+) -> Generator[TableUpdater, None, None]:
+    """Construct one TableUpdater, and so its records, for the whole module. Its
+    records are created in a record directory of their own, discarded once the
+    module finishes. Use `table_updater`, which mocks out its functionality."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(RecordLookup, "_RecordDirectory", {})
+        builder.ResetRecords()
+
+        client = AsyncioClient("123")
+        yield TableUpdater(
+            client,
+            EpicsName(EPICS_FORMAT_TABLE_NAME),
+            table_field_info,
+            table_data_1_dict,
+        )
+
+        builder.ResetRecords()
+
+
+@pytest.fixture
+def table_updater(
+    table_updater_shared: TableUpdater,
+    table_fields_records: Dict[str, TableFieldRecordContainer],
+) -> Generator[TableUpdater, None, None]:
+    """Provides a TableUpdater with configured records and mocked functionality,
+    restoring its all_values_dict when the test finishes"""
+    updater = table_updater_shared
+    updater.client.send = AsyncMock()  # type: ignore
     # mypy doesn't play well with mocking so suppress error
 
     mocked_mode_record = MagicMock()
@@ -80,28 +133,23 @@ def table_updater(
     )
     mode_record_info.add_record(mocked_mode_record)
 
-    updater = TableUpdater(
-        client,
-        EpicsName(EPICS_FORMAT_TABLE_NAME),
-        table_field_info,
-        table_data_1_dict,
-    )
-
     # Put mocks into TableUpdater
     updater.mode_record_info = mode_record_info
     for field_name, table_record_container in updater.table_fields_records.items():
         assert table_record_container.record_info
-        table_record_container.record_info.record = MagicMock()
-        type(table_record_container.record_info.record).name = PropertyMock(
-            return_value=EPICS_FORMAT_TABLE_NAME + ":" + field_name
-        )
-        table_record_container.record_info.record.get = MagicMock(
-            return_value=table_unpacked_data[EpicsName(field_name)]
-        )
+        fake_record_info = table_fields_records[field_name].record_info
+        assert fake_record_info
+        table_record_container.record_info.record = fake_record_info.record
 
-    return updater
+    all_values = dict(updater.all_values_dict)
+    try:
+        yield updater
+    finally:
+        updater.all_values_dict.clear()
+        updater.all_values_dict.update(all_values)
 
 
+@pytest.mark.integration
 async def test_create_softioc_update_table(
     mocked_panda_standard_responses,
     table_unpacked_data,
@@ -124,7 +172,7 @@ async def test_create_softioc_update_table(
 
         curr_val = await asyncio.wait_for(capturing_queue.get(), TIMEOUT)
         # First response is the current value
-        numpy.testing.assert_array_equal(curr_val, table_unpacked_data["TIME1"])
+        _eq(curr_val, table_unpacked_data["TIME1"])
 
         # Wait for the new value to appear
         curr_val = await asyncio.wait_for(capturing_queue.get(), TIMEOUT)
@@ -159,6 +207,7 @@ async def test_create_softioc_update_table(
         monitor.close()
 
 
+@pytest.mark.integration
 async def test_create_softioc_table_update_send_to_panda(
     mocked_panda_standard_responses,
 ):
@@ -199,40 +248,74 @@ async def test_create_softioc_table_update_send_to_panda(
         command_to_key(
             Put(
                 field="SEQ.TABLE",
-                value=[
-                    "2457862145",
-                    "4294967291",
-                    "100",
-                    "0",
-                    "1",
-                    "0",
-                    "0",
-                    "0",
-                    "4293918721",
-                    "0",
-                    "9",
-                    "9999",
-                    "2035875841",
-                    "444444",
-                    "5",
-                    "1",
-                    "3464232961",
-                    "4294967197",
-                    "99999",
-                    "2222",
-                ],
+                value=list(SEQ_TABLE_REPEATS_SET_DATA),
             )
         )
         in commands_recieved_by_panda
     )
 
 
+def test_table_updater_update_table_direct(
+    table_updater: TableUpdater, table_data_2: List[str]
+):
+    """Test that update_table sets the new values PandA reports into the records,
+    without going through Channel Access. See test_create_softioc_update_table for
+    the equivalent over CA."""
+
+    table_updater.update_table(table_data_2)
+
+    def set_value(field_name: str) -> ndarray:
+        record_info = table_updater.table_fields_records[field_name].record_info
+        assert record_info
+        return record_info.record.set.call_args[0][0]
+
+    _eq(set_value("TIME1"), [100, 0, 9, 5, 99999])
+    _eq(
+        set_value("TRIGGER"),
+        [
+            "Immediate",
+            "Immediate",
+            "Immediate",
+            "POSB>=POSITION",
+            "POSC<=POSITION",
+        ],
+    )
+    _eq(set_value("POSITION"), [-5, 0, 0, 444444, -99])
+    _eq(set_value("OUTD2"), [0, 0, 1, 1, 0])
+
+
+async def test_table_updater_update_mode_submit_direct(
+    table_updater: TableUpdater, table_data_2: List[str]
+):
+    """Test that editing a table's records and then submitting sends the new table to
+    PandA, without going through Channel Access. See
+    test_create_softioc_table_update_send_to_panda for the equivalent over CA."""
+
+    table_updater.update_table(table_data_2)
+    # Records only hold what they were last set to, so load in the updated table
+    for field_record in table_updater.table_fields_records.values():
+        assert field_record.record_info
+        record = field_record.record_info.record
+        record.value = record.set.call_args[0][0]
+
+    repeats_record_info = table_updater.table_fields_records["REPEATS"].record_info
+    assert repeats_record_info
+    repeats_record_info.record.value = numpy.array([1, 1, 1, 1, 1])
+
+    await table_updater.update_mode(TableModeEnum.SUBMIT.value)
+
+    assert isinstance(table_updater.client.send, AsyncMock)
+    table_updater.client.send.assert_called_once_with(
+        Put(PANDA_FORMAT_TABLE_NAME, list(SEQ_TABLE_REPEATS_SET_DATA))
+    )
+
+
 def test_table_updater_validate_mode_view(table_updater: TableUpdater):
     """Test the validate method when mode is View"""
 
     # View is default in table_updater
     record = MagicMock()
-    record.name = MagicMock(return_value="NewRecord")
+    record.name = "NewRecord"
     assert table_updater.validate_waveform(record, "value is irrelevant") is False
 
 
@@ -244,7 +327,7 @@ def test_table_updater_validate_mode_edit(table_updater: TableUpdater):
     )
 
     record = MagicMock()
-    record.name = MagicMock(return_value="NewRecord")
+    record.name = "NewRecord"
     assert table_updater.validate_waveform(record, "value is irrelevant") is True
 
 
@@ -256,7 +339,7 @@ def test_table_updater_validate_mode_submit(table_updater: TableUpdater):
     )
 
     record = MagicMock()
-    record.name = MagicMock(return_value="NewRecord")
+    record.name = "NewRecord"
     assert table_updater.validate_waveform(record, "value is irrelevant") is False
 
 
@@ -268,7 +351,7 @@ def test_table_updater_validate_mode_discard(table_updater: TableUpdater):
     )
 
     record = MagicMock()
-    record.name = MagicMock(return_value="NewRecord")
+    record.name = "NewRecord"
     assert table_updater.validate_waveform(record, "value is irrelevant") is False
 
 
@@ -279,7 +362,7 @@ def test_table_updater_validate_mode_unknown(table_updater: TableUpdater):
     table_updater.mode_record_info.record.set_alarm = MagicMock()
 
     record = MagicMock()
-    record.name = MagicMock(return_value="NewRecord")
+    record.name = "NewRecord"
 
     assert table_updater.validate_waveform(record, "value is irrelevant") is False
     table_updater.mode_record_info.record.set_alarm.assert_called_once_with(
@@ -348,7 +431,27 @@ async def test_table_updater_update_mode_submit_exception(
             labels = table_fields[field_name].labels
             expected = numpy.array([labels[x] for x in expected])
 
-        numpy.testing.assert_array_equal(data, expected)
+        _eq(data, expected)
+
+    table_updater.mode_record_info.record.set.assert_called_once_with(
+        TableModeEnum.VIEW.value, process=False
+    )
+
+
+async def test_table_updater_update_mode_submit_unknown_label(
+    table_updater: TableUpdater,
+):
+    """Test that update_mode with new value of SUBMIT rolls back, without sending
+    data to PandA, when an enum field holds a value that is not one of its labels"""
+    record_info = table_updater.table_fields_records["TRIGGER"].record_info
+    assert record_info
+    record_info.record.value = numpy.array(["Immediate", "Not a label", "Immediate"])
+
+    await table_updater.update_mode(TableModeEnum.SUBMIT.value)
+
+    assert isinstance(table_updater.client.send, AsyncMock)
+    table_updater.client.send.assert_not_called()
+    record_info.record.set.assert_called_once()
 
     table_updater.mode_record_info.record.set.assert_called_once_with(
         TableModeEnum.VIEW.value, process=False
@@ -410,7 +513,7 @@ async def test_table_updater_update_mode_discard(
             labels = table_fields[field_name].labels
             expected = numpy.array([labels[x] for x in expected])
 
-        numpy.testing.assert_array_equal(data, expected)
+        _eq(data, expected)
 
     table_updater.mode_record_info.record.set.assert_called_once_with(
         TableModeEnum.VIEW.value, process=False
@@ -437,7 +540,7 @@ async def test_table_updater_update_mode_other(
         record_info = table_updater.table_fields_records[field_name].record_info
         assert record_info
 
-        record_info.record.assert_not_called()
+        record_info.record.set.assert_not_called()
 
     table_updater.mode_record_info.record.set.assert_not_called()
 
@@ -462,7 +565,7 @@ def test_table_updater_update_table(
         # numpy arrays don't play nice with mock's equality comparisons, do it ourself
         called_args = record_info.record.set.call_args
 
-        numpy.testing.assert_array_equal(data, called_args[0][0])
+        _eq(data, called_args[0][0])
 
 
 def test_table_updater_update_table_not_view(